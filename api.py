@@ -1,21 +1,32 @@
 """
 FastAPI server for HuduAssist KE RAG system
 Deploy this to Render to get API endpoints for your custom UI
+
+Set APP_TITLE / BRAND to serve another deployment (e.g. Huduma AI) from this module
 """
+import asyncio
+import functools
+import hashlib
+import logging
 import os
+import queue
 import sys
-import tempfile
 import uuid
-import requests
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
+import aiofiles.tempfile
+import anyio
+import httpx
 import uvicorn
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, UploadFile, Form
+from fastapi import BackgroundTasks, FastAPI, File, HTTPException, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 # Load environment variables
 load_dotenv()
@@ -27,19 +38,35 @@ sys.path.insert(0, str(modules_dir))
 
 # Import with error handling
 try:
-    from upload_file_rag import get_qa_chain, query_system
+    from session_store import SessionStore
 except ImportError as e:
     import traceback
-    print(f"Error importing upload_file_rag: {e}")
+    print(f"Error importing API modules: {e}")
     print(f"Current directory: {os.getcwd()}")
     print(f"Python path: {sys.path}")
     print(f"Traceback: {traceback.format_exc()}")
     raise
 
+
+@functools.lru_cache(maxsize=1)
+def _rag():
+    """
+    Import upload_file_rag on first use instead of at module import; a failed
+    import is not cached, so the next call retries it
+    """
+    import upload_file_rag
+    return upload_file_rag
+
+
+logger = logging.getLogger(__name__)
+
+APP_TITLE = os.environ.get("APP_TITLE", "HuduAssist KE")
+
 app = FastAPI(
-    title="HuduAssist KE API",
+    title=f"{APP_TITLE} API",
     description="RAG-based Q&A API for Kenyan Government information",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware - adjust origins for your frontend
@@ -51,35 +78,236 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory session storage (use Redis in production for scalability)
-sessions = {}
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", 3600))
+SESSION_SWEEP_INTERVAL = int(os.environ.get("SESSION_SWEEP_INTERVAL", 300))
+# Blocking work (PDF parsing, Gemini calls) runs in the anyio threadpool
+THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", 128))
+# Uploads and downloads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Every PDF starts with this header, whatever the file is called
+PDF_MAGIC = b"%PDF-"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+
+def _start_logging() -> QueueListener:
+    """
+    Route all log records through a queue so only a background thread writes
+    to stderr; request threads just enqueue. Started per worker, after fork.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    listener.start()
+    return listener
+
+
+def _remove_temp_file(temp_path: Optional[str]):
+    """Delete a session's temp file, ignoring files that are already gone"""
+    try:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+    except Exception as e:
+        logger.warning("Error deleting temp file: %s", e)
+
+
+async def _on_session_expired(session_id: str, session: dict):
+    _drop_session_chains(session_id)
+    # Unlink in the threadpool, like the other removal paths, not on the event loop
+    await run_in_threadpool(_remove_temp_file, session.get("temp_path"))
+
+
+# Session metadata is shared across workers via Redis (REDIS_URL); without it
+# sessions fall back to in-process storage, which only works with one worker
+session_store = SessionStore(
+    redis_url=os.environ.get("REDIS_URL"),
+    ttl_seconds=SESSION_TTL_SECONDS,
+    on_expired=_on_session_expired,
+    # Session hashes outlive their TTL key by two sweeps, so a sweep always sees
+    # them even when Redis expiry notifications are unavailable
+    expiry_grace_seconds=2 * SESSION_SWEEP_INTERVAL
+)
+
+
+async def _store_upload(temp_path: str, doc_hash: str) -> str:
+    """
+    Keep an upload's temp file until its first query ingests it. The file is
+    removed straight away when a FAISS index for the same content is cached.
+    """
+    if await run_in_threadpool(_rag().is_vector_store_cached, doc_hash):
+        await run_in_threadpool(_remove_temp_file, temp_path)
+        return ""
+    return temp_path
+
+
+# QA chains hold FAISS indexes and can't be serialized, so each worker keeps
+# its own bounded cache and builds a chain on the first query that needs it.
+# Keyed by (session_id, doc_hash): a re-upload under the same session_id on
+# another worker changes the key, so no worker serves the old document's chain
+qa_chains = TTLCache(maxsize=64, ttl=1800)
+
+
+def _drop_session_chains(session_id: str):
+    """Forget this worker's cached chains for a session, whatever document they were for"""
+    for key in [key for key in list(qa_chains.keys()) if key[0] == session_id]:
+        qa_chains.pop(key, None)
+
+
+async def _sweep_sessions():
+    """Periodically drop expired sessions, their temp files and cached chains"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await session_store.purge_expired()
+            qa_chains.expire()
+        except Exception as e:
+            logger.warning("Error sweeping sessions: %s", e)
+
+
+async def _replace_session(
+    background_tasks: BackgroundTasks,
+    session_id: str,
+    filename: str,
+    temp_path: str,
+    doc_hash: str
+):
+    """Save a session, removing the temp file of any session it replaces after the response"""
+    previous = await session_store.get(session_id)
+    await session_store.save(session_id, filename, temp_path, doc_hash)
+    _drop_session_chains(session_id)
+    
+    if previous and previous.get("temp_path") and previous["temp_path"] != temp_path:
+        background_tasks.add_task(_remove_temp_file, previous["temp_path"])
+
+
+# In-flight chain builds, so concurrent first queries share one ingestion
+_chain_builds = {}
+
+
+async def _get_session_chain(session_id: str, session: dict):
+    """Return the session's QA chain, ingesting its document on first use"""
+    # A build still running for a replaced document keeps its own key, so it
+    # can neither be awaited by nor overwrite the chain for the new one
+    chain_key = (session_id, session.get("doc_hash") or "")
+    qa_chain = qa_chains.get(chain_key)
+    if qa_chain is not None:
+        return qa_chain
+    
+    # Build from the FAISS cache, or from the temp file if it has one
+    temp_path = session.get("temp_path") or None
+    build = _chain_builds.get(chain_key)
+    if build is None:
+        build = asyncio.ensure_future(
+            run_in_threadpool(_rag().get_qa_chain, temp_path, session.get("doc_hash") or None)
+        )
+        _chain_builds[chain_key] = build
+        build.add_done_callback(lambda _: _chain_builds.pop(chain_key, None))
+    
+    # Shield so a disconnecting client doesn't cancel a build others await
+    qa_chain = await asyncio.shield(build)
+    if qa_chain is None:
+        if not (temp_path and os.path.exists(temp_path)):
+            raise HTTPException(
+                status_code=410,
+                detail="Session document is no longer available. Please upload it again."
+            )
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to initialize QA system. Check server logs for details."
+        )
+    
+    qa_chains[chain_key] = qa_chain
+    return qa_chain
+
+
+def _probe_import():
+    """
+    Check that the RAG module and its lazily imported dependencies load;
+    returns (modules_ok, module_error)
+    """
+    try:
+        _rag().preload_dependencies()
+        return True, None
+    except Exception as e:
+        return False, str(e)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Check that everything is configured correctly on startup"""
+    app.state.log_listener = _start_logging()
     errors = []
     
+    # Gemini calls are I/O bound, so allow more of them in flight per worker
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
     # Check API key
     if not os.environ.get("GOOGLE_API_KEY"):
         errors.append("GOOGLE_API_KEY environment variable is not set")
     
-    # Check if modules can be imported
+    # Check if modules can be imported (cached for /health)
+    app.state.modules_ok, app.state.module_error = _probe_import()
+    if not app.state.modules_ok:
+        errors.append(f"Failed to import upload_file_rag: {app.state.module_error}")
+    
+    # Connect the shared session store (per worker, after Gunicorn forks).
+    # Fail startup if REDIS_URL is set but unreachable: falling back to
+    # per-worker memory would make sessions 404 on every other worker
     try:
-        from upload_file_rag import get_qa_chain, query_system
-    except Exception as e:
-        errors.append(f"Failed to import upload_file_rag: {str(e)}")
+        await session_store.connect()
+    except Exception:
+        logger.exception("Failed to connect to Redis at REDIS_URL")
+        raise
+    
+    # One pooled HTTP/2 client for outbound downloads, so repeat hosts reuse
+    # their TCP/TLS connections
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+    
+    app.state.session_watcher = None
+    if session_store.backend == "redis":
+        app.state.session_watcher = asyncio.create_task(session_store.watch_expired())
+    app.state.session_sweeper = asyncio.create_task(_sweep_sessions())
+    
+    # General Q&A shares the document chains' model instead of building another
+    app.state.general_llm = None
+    if os.environ.get("GOOGLE_API_KEY"):
+        try:
+            app.state.general_llm = _rag().load_model()[0]
+            # Register the cached prefix up front rather than on the first query
+            await run_in_threadpool(_rag().get_prompt_cache_name)
+        except Exception as e:
+            errors.append(f"Failed to initialize general Q&A model: {str(e)}")
     
     if errors:
-        print("=" * 50)
-        print("STARTUP ERRORS:")
-        for error in errors:
-            print(f"  - {error}")
-        print("=" * 50)
+        logger.error("Startup errors:\n%s", "\n".join(f"  - {error}" for error in errors))
         # Don't raise - let the app start so health check can report the issue
     else:
-        print("✓ API started successfully")
-        print(f"✓ GOOGLE_API_KEY configured: {bool(os.environ.get('GOOGLE_API_KEY'))}")
+        logger.info(
+            "API started successfully (GOOGLE_API_KEY configured: %s, session store: %s)",
+            bool(os.environ.get("GOOGLE_API_KEY")),
+            session_store.backend
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the session background tasks and close the Redis pool and HTTP client"""
+    if app.state.session_watcher is not None:
+        app.state.session_watcher.cancel()
+    app.state.session_sweeper.cancel()
+    await session_store.close()
+    await app.state.http.aclose()
+    app.state.log_listener.stop()
 
 
 class QueryRequest(BaseModel):
@@ -111,7 +339,7 @@ class GeneralQueryRequest(BaseModel):
 async def root():
     """Root endpoint"""
     return {
-        "message": "HuduAssist KE API",
+        "message": f"{APP_TITLE} API",
         "version": "1.0.0",
         "status": "running"
     }
@@ -120,14 +348,11 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    try:
-        # Try to import to verify modules are available
-        from upload_file_rag import get_qa_chain, query_system
-        modules_ok = True
-        module_error = None
-    except Exception as e:
-        modules_ok = False
-        module_error = str(e)
+    # Only re-probe after a failure, so a bad deploy can recover without a restart
+    if not app.state.modules_ok:
+        app.state.modules_ok, app.state.module_error = _probe_import()
+    modules_ok = app.state.modules_ok
+    module_error = app.state.module_error
     
     api_key_configured = bool(os.environ.get("GOOGLE_API_KEY"))
     
@@ -136,7 +361,8 @@ async def health_check():
     response = {
         "status": status,
         "api_key_configured": api_key_configured,
-        "modules_loaded": modules_ok
+        "modules_loaded": modules_ok,
+        "session_store": session_store.backend
     }
     
     if module_error:
@@ -147,11 +373,12 @@ async def health_check():
 
 @app.post("/upload", response_model=UploadResponse)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: Optional[str] = Form(None)
 ):
     """
-    Upload a PDF document and initialize the QA chain
+    Upload a PDF document; it is processed on the first query
     
     Returns a session_id that should be used for subsequent queries
     """
@@ -170,34 +397,34 @@ async def upload_document(
                 detail=f"Unsupported file type. Supported types: PDF, DOC, DOCX, CSV, JPG, PNG, GIF, BMP, WEBP"
             )
         
-        # Save uploaded file temporarily
+        # Reject misnamed files before buffering or parsing anything
+        if file_ext == '.pdf':
+            head = await file.read(len(PDF_MAGIC))
+            await file.seek(0)
+            if head != PDF_MAGIC:
+                raise HTTPException(
+                    status_code=400,
+                    detail="File is not a valid PDF document"
+                )
+        
+        # Stream uploaded file to disk, hashing it for the FAISS index cache
         suffix = Path(file.filename).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
+        hasher = hashlib.sha256()
+        async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix=suffix) as temp_file:
             temp_path = temp_file.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await temp_file.write(chunk)
+                hasher.update(chunk)
+        doc_hash = hasher.hexdigest()
         
-        # Initialize QA chain
-        qa_chain = get_qa_chain(temp_path)
+        temp_path = await _store_upload(temp_path, doc_hash)
         
-        if qa_chain is None:
-            # Clean up temp file
-            os.unlink(temp_path)
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to initialize QA system. Check server logs for details."
-            )
-        
-        # Store session
-        sessions[session_id] = {
-            "qa_chain": qa_chain,
-            "temp_path": temp_path,
-            "filename": file.filename
-        }
+        # Store session; the document is ingested on its first query
+        await _replace_session(background_tasks, session_id, file.filename, temp_path, doc_hash)
         
         return UploadResponse(
             session_id=session_id,
-            message="Document uploaded and processed successfully",
+            message="Document uploaded successfully",
             filename=file.filename
         )
     
@@ -206,10 +433,7 @@ async def upload_document(
     except Exception as e:
         # Clean up temp file if it exists
         if 'temp_path' in locals():
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+            await run_in_threadpool(_remove_temp_file, temp_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing file: {str(e)}"
@@ -217,9 +441,9 @@ async def upload_document(
 
 
 @app.post("/upload-url", response_model=UploadResponse)
-async def upload_from_url(request: UploadUrlRequest):
+async def upload_from_url(request: UploadUrlRequest, background_tasks: BackgroundTasks):
     """
-    Upload a PDF document from a URL and initialize the QA chain
+    Upload a PDF document from a URL; it is processed on the first query
     
     Returns a session_id that should be used for subsequent queries
     """
@@ -237,63 +461,61 @@ async def upload_from_url(request: UploadUrlRequest):
                 detail="Invalid URL. Must start with http:// or https://"
             )
         
-        # Download the file
+        # Download the file without blocking the event loop
+        temp_path = None
         try:
-            response = requests.get(request.url, timeout=30, stream=True)
-            response.raise_for_status()
-            
-            # Check content type and file extension
-            content_type = response.headers.get('content-type', '').lower()
-            url_lower = request.url.lower()
-            allowed_extensions = ['.pdf', '.doc', '.docx', '.csv', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-            
-            # Check if URL ends with allowed extension
-            has_allowed_ext = any(url_lower.endswith(ext) for ext in allowed_extensions)
-            # Check content type (more lenient - accept if it's a document or image type)
-            is_document_type = any(ct in content_type for ct in ['pdf', 'document', 'msword', 'wordprocessing', 'image', 'csv', 'text'])
-            
-            if not has_allowed_ext and not is_document_type:
-                raise HTTPException(
-                    status_code=400,
-                    detail="URL does not point to a supported file. Supported types: PDF, DOC, DOCX, CSV, JPG, PNG, GIF, BMP, WEBP"
-                )
-            
-            # Save to temporary file
-            suffix = '.pdf'
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    temp_file.write(chunk)
-                temp_path = temp_file.name
+            async with app.state.http.stream("GET", request.url) as response:
+                response.raise_for_status()
+                
+                # Downloads are ingested as PDFs, so only accept those
+                content_type = response.headers.get('content-type', '').lower()
+                is_pdf = request.url.lower().endswith('.pdf') or 'pdf' in content_type
+                
+                if not is_pdf:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="URL does not point to a PDF document"
+                    )
+                
+                # Stream the download to disk, hashing it for the FAISS index cache
+                hasher = hashlib.sha256()
+                size = 0
+                async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix='.pdf') as temp_file:
+                    temp_path = temp_file.name
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        # Stop at the first chunk if the body is not actually a PDF
+                        if size == 0 and not chunk.startswith(PDF_MAGIC):
+                            break
+                        await temp_file.write(chunk)
+                        hasher.update(chunk)
+                        size += len(chunk)
+                doc_hash = hasher.hexdigest()
+                
+                if size == 0:
+                    await run_in_threadpool(_remove_temp_file, temp_path)
+                    raise HTTPException(
+                        status_code=400,
+                        detail="URL does not point to a valid PDF document"
+                    )
             
             filename = request.url.split('/')[-1] or 'document.pdf'
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
+            # Remove whatever a transfer that failed mid-stream had written
+            await run_in_threadpool(_remove_temp_file, temp_path)
             raise HTTPException(
                 status_code=400,
                 detail=f"Failed to download file from URL: {str(e)}"
             )
         
-        # Initialize QA chain
-        qa_chain = get_qa_chain(temp_path)
-        
-        if qa_chain is None:
-            # Clean up temp file
-            os.unlink(temp_path)
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to initialize QA system. Check server logs for details."
-            )
+        temp_path = await _store_upload(temp_path, doc_hash)
         
-        # Store session
-        sessions[session_id] = {
-            "qa_chain": qa_chain,
-            "temp_path": temp_path,
-            "filename": filename
-        }
+        # Store session; the document is ingested on its first query
+        await _replace_session(background_tasks, session_id, filename, temp_path, doc_hash)
         
         return UploadResponse(
             session_id=session_id,
-            message="Document uploaded and processed successfully",
+            message="Document uploaded successfully",
             filename=filename
         )
     
@@ -302,10 +524,7 @@ async def upload_from_url(request: UploadUrlRequest):
     except Exception as e:
         # Clean up temp file if it exists
         if 'temp_path' in locals():
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+            await run_in_threadpool(_remove_temp_file, temp_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing URL: {str(e)}"
@@ -324,36 +543,22 @@ async def query_document(request: QueryRequest):
     try:
         # If no session_id, use general Q&A mode
         if not request.session_id:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            from dotenv import load_dotenv
-            
-            load_dotenv()
-            api_key = os.environ.get("GOOGLE_API_KEY")
-            if not api_key:
+            if app.state.general_llm is None:
                 raise HTTPException(
                     status_code=500,
                     detail="API key not configured"
                 )
             
-            # Use the prompt template from upload_file_rag for general queries
-            from upload_file_rag import PROMPT_TEMPLATE
-            from langchain_core.prompts import PromptTemplate
-            
-            llm = ChatGoogleGenerativeAI(
-                model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
-                google_api_key=api_key,
-                temperature=0.4,
-                convert_system_message_to_human=True
-            )
-            
-            # Format prompt for general query (no document context)
-            prompt = PromptTemplate(
-                template=PROMPT_TEMPLATE.replace("{context}\n\n", ""),
-                input_variables=["question"]
-            )
-            
-            prompt_text = prompt.format(question=request.query)
-            raw_response = llm.invoke(prompt_text)
+            prompt_cache_name = await run_in_threadpool(_rag().get_prompt_cache_name)
+            if prompt_cache_name:
+                # Static prefix is already on Gemini's side; send only the question
+                prompt_text = _rag().format_prompt("", request.query, include_prefix=False)
+                raw_response = await run_in_threadpool(
+                    app.state.general_llm.invoke, prompt_text, cached_content=prompt_cache_name
+                )
+            else:
+                prompt_text = _rag().format_prompt("", request.query)
+                raw_response = await run_in_threadpool(app.state.general_llm.invoke, prompt_text)
             
             if hasattr(raw_response, "content"):
                 answer = raw_response.content
@@ -361,22 +566,22 @@ async def query_document(request: QueryRequest):
                 answer = str(raw_response)
             
             return QueryResponse(
-                response=f"HuduAssist 🇰🇪: {answer}",
+                response=f"{_rag().BRAND}: {answer}",
                 session_id=None
             )
         
         # Document-based query mode
-        if request.session_id not in sessions:
+        session = await session_store.get(request.session_id)
+        if session is None:
             raise HTTPException(
                 status_code=404,
                 detail="Session not found. Please upload a document first, or omit session_id for general questions."
             )
         
-        session = sessions[request.session_id]
-        qa_chain = session["qa_chain"]
+        qa_chain = await _get_session_chain(request.session_id, session)
         
         # Query the system
-        response = query_system(request.query, qa_chain)
+        response = await run_in_threadpool(_rag().query_system, request.query, qa_chain)
         
         return QueryResponse(
             response=response,
@@ -397,23 +602,16 @@ async def delete_session(session_id: str):
     """
     Delete a session and clean up resources
     """
-    if session_id not in sessions:
+    session = await session_store.delete(session_id)
+    if session is None:
         raise HTTPException(
             status_code=404,
             detail="Session not found"
         )
     
-    session = sessions[session_id]
-    
-    # Clean up temp file
-    try:
-        if os.path.exists(session["temp_path"]):
-            os.unlink(session["temp_path"])
-    except Exception as e:
-        print(f"Error deleting temp file: {e}")
-    
-    # Remove session
-    del sessions[session_id]
+    # Clean up cached chain and temp file
+    _drop_session_chains(session_id)
+    await run_in_threadpool(_remove_temp_file, session.get("temp_path"))
     
     return {
         "message": "Session deleted successfully",
@@ -426,14 +624,15 @@ async def list_sessions():
     """
     List all active sessions (for debugging)
     """
+    sessions = await session_store.list()
     return {
         "active_sessions": len(sessions),
         "sessions": [
             {
-                "session_id": sid,
+                "session_id": session["session_id"],
                 "filename": session["filename"]
             }
-            for sid, session in sessions.items()
+            for session in sessions
         ]
     }
 
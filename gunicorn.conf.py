@@ -0,0 +1,28 @@
+"""
+Gunicorn settings for the HuduAssist KE API
+Used by the Procfile and render.yaml start commands
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+# Without REDIS_URL sessions live in each worker's memory, so only one worker
+# can serve them; scale out only when Redis shares sessions across workers
+default_workers = multiprocessing.cpu_count() * 2 + 1 if os.environ.get("REDIS_URL") else 1
+workers = int(os.environ.get("WEB_CONCURRENCY", default_workers))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (and its heavy LangChain/FAISS imports) once in the master so
+# workers share those pages copy-on-write. Per-worker state such as the Redis
+# pool is created in the app's startup event, after the fork.
+preload_app = True
+
+# PDF ingestion and embedding can take a while on large uploads
+timeout = 120
+
+
+def on_starting(server):
+    # The app imports LangChain/FAISS lazily so single-process starts are fast;
+    # under Gunicorn load them once in the master for the workers to share
+    from upload_file_rag import preload_dependencies
+    preload_dependencies()
@@ -0,0 +1,217 @@
+"""
+Session storage for the HuduAssist KE API
+
+Session metadata ({filename, temp_path, doc_hash, created_at}) is kept in Redis when
+REDIS_URL is set, so every Gunicorn/Uvicorn worker sees the same sessions.
+Without Redis it falls back to an in-process dict (single worker only).
+The QA chain itself is not serializable and is cached per worker in api.py.
+"""
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = "session:"
+# Shadow key that expires before the session hash, so the expiry notification
+# (or purge_expired, if notifications are off) can still read temp_path from
+# the hash and clean it up. The grace must outlast the gap between purges.
+SESSION_TTL_KEY_PREFIX = "session-ttl:"
+EXPIRY_GRACE_SECONDS = 300
+
+
+class SessionStore:
+    """
+    Redis-backed session metadata store with an in-memory fallback.
+    on_expired is awaited on the event loop, so blocking cleanup (file removal)
+    belongs in a thread it starts.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 3600,
+        on_expired: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+        expiry_grace_seconds: int = EXPIRY_GRACE_SECONDS
+    ):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.expiry_grace_seconds = expiry_grace_seconds
+        self.on_expired = on_expired
+        self.redis = None
+        self._local: Dict[str, dict] = {}
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self.redis is not None else "memory"
+
+    async def connect(self):
+        """Open the Redis connection pool (call once per worker, post-fork)"""
+        if not self.redis_url:
+            return
+
+        import redis.asyncio as redis
+
+        client = redis.from_url(self.redis_url, decode_responses=True)
+        await client.ping()
+        self.redis = client
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    async def save(
+        self,
+        session_id: str,
+        filename: str,
+        temp_path: str,
+        doc_hash: Optional[str] = None
+    ) -> dict:
+        session = {
+            "filename": filename,
+            "temp_path": temp_path,
+            "doc_hash": doc_hash or "",
+            "created_at": str(time.time())
+        }
+
+        if self.redis is None:
+            self._local[session_id] = session
+            return session
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(SESSION_KEY_PREFIX + session_id)
+            pipe.hset(SESSION_KEY_PREFIX + session_id, mapping=session)
+            pipe.expire(SESSION_KEY_PREFIX + session_id, self.ttl_seconds + self.expiry_grace_seconds)
+            pipe.set(SESSION_TTL_KEY_PREFIX + session_id, "1", ex=self.ttl_seconds)
+            await pipe.execute()
+        return session
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        if self.redis is None:
+            session = self._local.get(session_id)
+            if session is not None and self._is_expired(session):
+                await self._expire_local(session_id)
+                return None
+            return session
+
+        session = await self.redis.hgetall(SESSION_KEY_PREFIX + session_id)
+        return session or None
+
+    async def delete(self, session_id: str) -> Optional[dict]:
+        """Remove a session and return its metadata (None if it did not exist)"""
+        if self.redis is None:
+            return self._local.pop(session_id, None)
+
+        key = SESSION_KEY_PREFIX + session_id
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(key)
+            pipe.delete(key, SESSION_TTL_KEY_PREFIX + session_id)
+            session, _ = await pipe.execute()
+        return session or None
+
+    async def list(self) -> List[dict]:
+        """Return all live sessions as dicts including their session_id"""
+        if self.redis is None:
+            await self.purge_expired()
+            return [
+                {"session_id": sid, **session}
+                for sid, session in self._local.items()
+            ]
+
+        keys = [key async for key in self.redis.scan_iter(match=SESSION_KEY_PREFIX + "*")]
+        if not keys:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            results = await pipe.execute()
+
+        return [
+            {"session_id": key[len(SESSION_KEY_PREFIX):], **session}
+            for key, session in zip(keys, results)
+            if session
+        ]
+
+    async def purge_expired(self) -> int:
+        """
+        Expire stale sessions and return how many were removed. With Redis this
+        is a fallback for missed expiry notifications (or servers that have them
+        off): session hashes whose shadow TTL key is gone are expired here.
+        """
+        if self.redis is not None:
+            return await self._purge_expired_redis()
+
+        expired = [sid for sid, session in self._local.items() if self._is_expired(session)]
+        for session_id in expired:
+            await self._expire_local(session_id)
+        return len(expired)
+
+    async def _purge_expired_redis(self) -> int:
+        keys = [key async for key in self.redis.scan_iter(match=SESSION_KEY_PREFIX + "*")]
+        if not keys:
+            return 0
+
+        session_ids = [key[len(SESSION_KEY_PREFIX):] for key in keys]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(SESSION_TTL_KEY_PREFIX + session_id)
+            alive = await pipe.execute()
+
+        purged = 0
+        for session_id, ttl_key_exists in zip(session_ids, alive):
+            if ttl_key_exists:
+                continue
+            # delete() returns None if the notification handler got there first
+            session = await self.delete(session_id)
+            if session:
+                purged += 1
+                if self.on_expired:
+                    await self.on_expired(session_id, session)
+        return purged
+
+    async def watch_expired(self):
+        """
+        Listen for Redis key expiry notifications and run on_expired for each
+        session, so tempfiles are removed even if the client never deletes it
+        """
+        if self.redis is None:
+            return
+
+        try:
+            # Add keyevent (E) + expired (x) to whatever flags are already set
+            config = await self.redis.config_get("notify-keyspace-events")
+            flags = config.get("notify-keyspace-events", "")
+            missing = "".join(flag for flag in "Ex" if flag not in flags and not (flag == "x" and "A" in flags))
+            if missing:
+                await self.redis.config_set("notify-keyspace-events", flags + missing)
+        except Exception as e:
+            # Managed Redis often disallows CONFIG; it may already be enabled, and
+            # purge_expired still cleans up sessions if it is not
+            logger.warning("Could not enable Redis keyspace notifications: %s", e)
+
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe("__keyevent@*__:expired")
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "pmessage":
+                    continue
+                key = message.get("data") or ""
+                if not key.startswith(SESSION_TTL_KEY_PREFIX):
+                    continue
+
+                session_id = key[len(SESSION_TTL_KEY_PREFIX):]
+                session = await self.delete(session_id)
+                if session and self.on_expired:
+                    await self.on_expired(session_id, session)
+        finally:
+            await pubsub.aclose()
+
+    def _is_expired(self, session: dict) -> bool:
+        return time.time() - float(session["created_at"]) > self.ttl_seconds
+
+    async def _expire_local(self, session_id: str):
+        session = self._local.pop(session_id, None)
+        if session and self.on_expired:
+            await self.on_expired(session_id, session)
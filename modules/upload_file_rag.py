@@ -1,212 +1,753 @@
+from __future__ import annotations
+
+import asyncio
 import os
 import sys
-import glob
 import warnings
-import base64
-from typing import List
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
-from langchain_community.document_loaders import PyPDFLoader, CSVLoader, UnstructuredWordDocumentLoader
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma, FAISS
+# Heavy dependencies (FAISS, Gemini clients, loaders, splitters) are imported
+# inside the functions that use them to keep cold start and idle RSS low
 from langchain_core.documents import Document
 
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.vectorstores import VectorStoreRetriever
+    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+# A QA chain takes {"query": ...} and returns {"result": ..., "source_documents": [...]}
+QAChain = Callable[[dict], dict]
+
+logger = logging.getLogger(__name__)
+
 warnings.filterwarnings("ignore")
 
 # Ensure src path is included (optional, only if src directory exists)
 src_paths = ['./src', '../src/']
 for path in src_paths:
-  if os.path.exists(path):
-    sys.path.insert(1, path)
+    if os.path.exists(path):
+        sys.path.insert(1, path)
 
 load_dotenv()
 
 # Load API key from environment (don't raise at import time - check in functions)
 GEMINI_API_KEY = os.environ.get("GOOGLE_API_KEY")
 
+GEMINI_EMBED_MODEL = os.environ.get("GEMINI_EMBED_MODEL", "models/text-embedding-004")
 
-def load_model():
-  """
-  Load LLM and embeddings
-  """
-  if not GEMINI_API_KEY:
-    raise ValueError("GOOGLE_API_KEY is not set in environment variables. Please set it in Render environment variables.")
-  
-  model = ChatGoogleGenerativeAI(
-    model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
-    google_api_key=GEMINI_API_KEY,
-    temperature=0.4,
-    convert_system_message_to_human=True
-  )
-  embeddings = GoogleGenerativeAIEmbeddings(
-    model=os.environ.get("GEMINI_EMBED_MODEL", "models/text-embedding-004"),
-    google_api_key=GEMINI_API_KEY
-  )
-  return model, embeddings
-
-
-def extract_text_from_image(image_path: str):
-  """
-  Extract text from image using Google Gemini Vision API
-  """
-  try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain_core.messages import HumanMessage
-    from PIL import Image
-    
-    # Read and prepare image
-    image = Image.open(image_path)
-    
-    # Use Gemini Vision to extract text
-    llm = ChatGoogleGenerativeAI(
-      model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
-      google_api_key=GEMINI_API_KEY,
-      temperature=0.1
+# "grpc" keeps one long-lived channel per client; "rest" is available as a fallback
+GEMINI_TRANSPORT = os.environ.get("GEMINI_TRANSPORT", "grpc")
+
+# Prefix for answers, so other deployments can rebrand without a code copy
+BRAND = os.environ.get("BRAND", "HuduAssist 🇰🇪")
+
+# Queries at least this similar (cosine) to a previous one reuse its answer
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", 1024))
+
+# Answers to exact repeat questions (per document), shared by all sessions in the process
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", 1024))
+QUERY_CACHE_TTL = int(os.environ.get("QUERY_CACHE_TTL", 3600))
+
+# Gemini Vision calls in flight at once when loading a directory's images
+IMAGE_OCR_CONCURRENCY = int(os.environ.get("IMAGE_OCR_CONCURRENCY", 8))
+# Processes for CPU-bound parsing (PDF/DOCX/CSV) of directory sources
+LOAD_PROCESSES = int(os.environ.get("HUDUMA_LOAD_THREADS", max(1, (os.cpu_count() or 1) - 1)))
+
+# Supported image types (sent to Gemini Vision with this MIME type) and Word documents
+_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.webp': 'image/webp',
+}
+_IMG_EXTS = frozenset(_MIME)
+_DOC_EXTS = frozenset({'.doc', '.docx'})
+
+# Chunking and retrieval settings; small chunks keep Gemini prompts short
+# Chunk sizes are in tokens of RAG_TOKEN_ENCODING (400 tokens is about 1600 characters)
+RAG_CHUNK_SIZE = int(os.environ.get("RAG_CHUNK_SIZE", 400))
+RAG_CHUNK_OVERLAP = int(os.environ.get("RAG_CHUNK_OVERLAP", 40))
+RAG_TOKEN_ENCODING = os.environ.get("RAG_TOKEN_ENCODING", "cl100k_base")
+RAG_TOP_K = int(os.environ.get("RAG_TOP_K", 4))
+# Caps on the retrieved context sent to Gemini, in characters
+RAG_MAX_CONTEXT_CHARS = int(os.environ.get("RAG_MAX_CONTEXT_CHARS", 12000))
+RAG_MAX_CHUNK_CHARS = int(os.environ.get("RAG_MAX_CHUNK_CHARS", 3000))
+# Optional cross-encoder rerank (needs flashrank); 0 disables it
+RAG_RERANK_TOP_N = int(os.environ.get("RAG_RERANK_TOP_N", 0))
+RAG_RERANK_MODEL = os.environ.get("RAG_RERANK_MODEL", "ms-marco-MiniLM-L-12-v2")
+
+# Register the static system prompt with Gemini context caching (opt-in). Gemini
+# only caches content of at least GEMINI_PROMPT_CACHE_MIN_TOKENS; the current
+# prompt prefix is shorter (~700 tokens), so this stays off until it grows.
+GEMINI_PROMPT_CACHE = os.environ.get("GEMINI_PROMPT_CACHE", "").lower() in ("1", "true", "yes")
+GEMINI_PROMPT_CACHE_TTL = int(os.environ.get("GEMINI_PROMPT_CACHE_TTL", 3600))
+GEMINI_PROMPT_CACHE_MIN_TOKENS = 1024
+
+# FAISS indexes are cached on disk by document content hash
+FAISS_CACHE_DIR = os.environ.get("FAISS_CACHE_DIR", "./faiss_cache")
+# Raw faiss index plus the chunk texts/metadata as JSON, smaller than LangChain's pickle
+FAISS_INDEX_FILE = "index.faiss"
+FAISS_CHUNKS_FILE = "chunks.json"
+# Entries unused for this long are evicted, then the least recently used until the cache fits
+FAISS_CACHE_MAX_AGE = int(os.environ.get("FAISS_CACHE_MAX_AGE", 30 * 24 * 3600))
+FAISS_CACHE_MAX_BYTES = int(os.environ.get("FAISS_CACHE_MAX_BYTES", 2 * 1024**3))
+EMBED_BATCH_SIZE = 100
+# Above this many chunks use IVF-PQ; below it HNSW over 8-bit scalar-quantized vectors
+FAISS_IVFPQ_MIN_CHUNKS = int(os.environ.get("FAISS_IVFPQ_MIN_CHUNKS", 2000))
+FAISS_HNSW_M = 32
+FAISS_NPROBE = int(os.environ.get("FAISS_NPROBE", 8))
+# Move indexes onto all visible GPUs (needs faiss-gpu); ignored with faiss-cpu
+USE_GPU_FAISS = os.environ.get("HUDUMA_USE_GPU_FAISS", "").lower() in ("1", "true", "yes")
+# Concurrent embedding requests when indexing; each carries EMBED_BATCH_SIZE chunks
+EMBED_MAX_WORKERS = int(os.environ.get("EMBED_MAX_WORKERS", 8))
+
+# Number of distinct retrieved chunk sets whose joined context is kept per chain
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get("RETRIEVAL_CACHE_MAX_ENTRIES", 256))
+
+
+@functools.lru_cache(maxsize=1)
+def load_model() -> Tuple[ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings]:
+    """
+    Load LLM and embeddings (created once per process and shared)
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+    if not GEMINI_API_KEY:
+        raise ValueError(
+            "GOOGLE_API_KEY is not set in environment variables. Please set it in Render environment variables."
+        )
+
+    model = ChatGoogleGenerativeAI(
+        model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
+        google_api_key=GEMINI_API_KEY,
+        temperature=0.4,
+        convert_system_message_to_human=True,
+        transport=GEMINI_TRANSPORT,
     )
-    
-    # Create message with image using langchain's format
-    # Gemini supports images directly in HumanMessage content
-    message = HumanMessage(
-      content=[
-        {
-          "type": "text",
-          "text": "Extract all text from this image. Return only the text content, no explanations."
-        },
-        {
-          "type": "image_url",
-          "image_url": image_path
-        }
-      ]
+    embeddings = GoogleGenerativeAIEmbeddings(
+        model=GEMINI_EMBED_MODEL,
+        google_api_key=GEMINI_API_KEY,
+        transport=GEMINI_TRANSPORT,
+        request_options={"timeout": 60},
+    )
+    return model, embeddings
+
+
+@functools.lru_cache(maxsize=1)
+def _get_vision_llm() -> ChatGoogleGenerativeAI:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
+        google_api_key=GEMINI_API_KEY,
+        temperature=0.1,
+        transport=GEMINI_TRANSPORT,
     )
-    
-    # Alternative: use the image object directly if supported
+
+
+def extract_text_from_image(image_path: str) -> List[Document]:
+    """
+    Extract text from image using Google Gemini Vision API
+    """
+    try:
+        from langchain_core.messages import HumanMessage
+
+        mime_type = _MIME.get(os.path.splitext(image_path)[1].lower(), 'image/jpeg')
+
+        # Send the raw bytes as an inline media part; the client puts them on
+        # the wire as-is, with no base64 copy of the image in between
+        with open(image_path, 'rb') as img_file:
+            image_bytes = img_file.read()
+
+        message = HumanMessage(
+            content=[
+                {
+                    "type": "text",
+                    "text": "Extract all text from this image. Return only the text content, no explanations.",
+                },
+                {"type": "media", "mime_type": mime_type, "data": image_bytes},
+            ]
+        )
+        response = _get_vision_llm().invoke([message])
+
+        text_content = response.content if hasattr(response, 'content') else str(response)
+
+        # Create a Document from the extracted text
+        return [Document(page_content=text_content, metadata={"source": image_path, "type": "image"})]
+    except Exception as e:
+        logger.exception("Failed to extract text from image %s", image_path)
+        raise ValueError(f"Failed to extract text from image: {str(e)}")
+
+
+# Each loader imports only its own langchain_community submodule, on first
+# use of that file type, rather than the document_loaders package
+def _load_pdf(file_path: str) -> List[Document]:
+    from langchain_community.document_loaders.pdf import PyPDFLoader
+
+    return PyPDFLoader(file_path).load()
+
+
+def _load_csv(file_path: str) -> List[Document]:
+    from langchain_community.document_loaders.csv_loader import CSVLoader
+
+    return CSVLoader(file_path).load()
+
+
+def _load_word(file_path: str) -> List[Document]:
+    from langchain_community.document_loaders.word_document import UnstructuredWordDocumentLoader
+
     try:
-      response = llm.invoke([message])
-    except:
-      # Fallback: encode as base64
-      with open(image_path, 'rb') as img_file:
-        image_bytes = img_file.read()
-      image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-      
-      ext = os.path.splitext(image_path)[1].lower()
-      mime_types = {
-        '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
-        '.gif': 'image/gif', '.bmp': 'image/bmp', '.webp': 'image/webp'
-      }
-      mime_type = mime_types.get(ext, 'image/jpeg')
-      
-      message = HumanMessage(
-        content=[
-          "Extract all text from this image. Return only the text content, no explanations.",
-          {
-            "type": "image_url",
-            "image_url": f"data:{mime_type};base64,{image_b64}"
-          }
-        ]
-      )
-      response = llm.invoke([message])
-    
-    text_content = response.content if hasattr(response, 'content') else str(response)
-    
-    # Create a Document from the extracted text
-    return [Document(page_content=text_content, metadata={"source": image_path, "type": "image"})]
-  except Exception as e:
-    print(f"[ERROR] Failed to extract text from image: {e}")
-    import traceback
-    print(f"[ERROR] Traceback: {traceback.format_exc()}")
-    raise ValueError(f"Failed to extract text from image: {str(e)}")
-
-
-def load_documents(source_dir: str):
-  """
-  Load documents from multiple sources: PDF, DOC, DOCX, CSV, and images (JPG, PNG, etc.)
-  """
-  documents = []
-
-  # Supported file extensions
-  image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-  doc_extensions = ['.doc', '.docx']
-  pdf_extensions = ['.pdf']
-  csv_extensions = ['.csv']
-
-  if os.path.isfile(source_dir):
-    ext = os.path.splitext(source_dir)[1].lower()
-    
-    if ext in pdf_extensions:
-      documents.extend(PyPDFLoader(source_dir).load())
-    elif ext in csv_extensions:
-      documents.extend(CSVLoader(source_dir).load())
-    elif ext in doc_extensions:
-      try:
         # Try UnstructuredWordDocumentLoader first
-        documents.extend(UnstructuredWordDocumentLoader(source_dir).load())
-      except Exception as e:
-        print(f"[WARNING] UnstructuredWordDocumentLoader failed: {e}")
+        return UnstructuredWordDocumentLoader(file_path).load()
+    except Exception as e:
+        logger.warning("UnstructuredWordDocumentLoader failed: %s", e)
         # Fallback: try python-docx if available
         try:
-          import docx
-          doc = docx.Document(source_dir)
-          text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-          documents.append(Document(page_content=text, metadata={"source": source_dir, "type": "docx"}))
+            import docx
+
+            doc = docx.Document(file_path)
+            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            return [Document(page_content=text, metadata={"source": file_path, "type": "docx"})]
         except ImportError:
-          raise ValueError("python-docx is required for DOCX files. Install it with: pip install python-docx")
+            raise ValueError("python-docx is required for DOCX files. Install it with: pip install python-docx")
         except Exception as e2:
-          raise ValueError(f"Failed to load DOCX file: {str(e2)}")
-    elif ext in image_extensions:
-      documents.extend(extract_text_from_image(source_dir))
+            raise ValueError(f"Failed to load DOCX file: {str(e2)}")
+
+
+# Loader for each supported file extension
+LOADERS: Dict[str, Callable[[str], List[Document]]] = {
+    '.pdf': _load_pdf,
+    '.csv': _load_csv,
+    **dict.fromkeys(_DOC_EXTS, _load_word),
+    **dict.fromkeys(_IMG_EXTS, extract_text_from_image),
+}
+
+
+def _load_single(file_path: str) -> List[Document]:
+    """
+    Load one file found in directory mode; unreadable files are skipped
+    """
+    loader = LOADERS.get(os.path.splitext(file_path)[1].lower())
+    if loader is None:
+        return []
+    try:
+        return loader(file_path)
+    except Exception as e:
+        logger.warning("Skipped %s - could not load: %s", file_path, e)
+        return []
+
+
+async def _load_images(image_paths: List[str]) -> List[List[Document]]:
+    """
+    OCR images concurrently (at most IMAGE_OCR_CONCURRENCY at a time), so N
+    images take about N / IMAGE_OCR_CONCURRENCY round-trips; results keep input order
+    """
+    semaphore = asyncio.Semaphore(IMAGE_OCR_CONCURRENCY)
+
+    async def load(path: str) -> List[Document]:
+        async with semaphore:
+            return await asyncio.to_thread(_load_single, path)
+
+    return await asyncio.gather(*(load(path) for path in image_paths))
+
+
+def load_documents(source_dir: Optional[str]) -> List[Document]:
+    """
+    Load documents from multiple sources: PDF, DOC, DOCX, CSV, and images (JPG, PNG, etc.)
+    """
+    if source_dir is None:
+        raise ValueError("No document source given and no cached index available")
+
+    documents = []
+
+    if os.path.isfile(source_dir):
+        ext = os.path.splitext(source_dir)[1].lower()
+        loader = LOADERS.get(ext)
+        if loader is None:
+            raise ValueError(
+                f"Unsupported file type: {ext}. Supported types: PDF, DOC, DOCX, CSV, JPG, PNG, GIF, BMP, WEBP"
+            )
+        documents.extend(loader(source_dir))
     else:
-      raise ValueError(f"Unsupported file type: {ext}. Supported types: PDF, DOC, DOCX, CSV, JPG, PNG, GIF, BMP, WEBP")
-  else:
-    # Directory mode - load all supported files
-    for pattern in ["*.pdf", "*.doc", "*.docx", "*.csv", "*.jpg", "*.jpeg", "*.png", "*.gif", "*.bmp", "*.webp"]:
-      for file_path in glob.glob(os.path.join(source_dir, pattern)):
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext in pdf_extensions:
-          documents.extend(PyPDFLoader(file_path).load())
-        elif ext in csv_extensions:
-          documents.extend(CSVLoader(file_path).load())
-        elif ext in doc_extensions:
-          try:
-            documents.extend(UnstructuredWordDocumentLoader(file_path).load())
-          except:
-            try:
-              import docx
-              doc = docx.Document(file_path)
-              text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-              documents.append(Document(page_content=text, metadata={"source": file_path, "type": "docx"}))
-            except:
-              print(f"[WARNING] Skipped {file_path} - could not load")
-        elif ext in image_extensions:
-          try:
-            documents.extend(extract_text_from_image(file_path))
-          except:
-            print(f"[WARNING] Skipped {file_path} - could not extract text from image")
-  
-  print(f"[DEBUG] Loaded {len(documents)} documents from {source_dir}")
-  
-  if not documents:
-    raise ValueError("No documents found in the specified sources or failed to extract text")
-  
-  return documents
-
-
-def create_vector_store(docs: List[Document], embeddings, chunk_size: int = 10000, chunk_overlap: int = 200):
-  """
-  Create vector store from documents
-  """
-  text_splitter = RecursiveCharacterTextSplitter(
-      chunk_size=chunk_size,
-      chunk_overlap=chunk_overlap
-  )
-  splits = text_splitter.split_documents(docs)
-  
-  if not splits:
-    raise ValueError("Documents did not contain any readable text chunks")
-  
-  # Use FAISS for retrieval
-  return FAISS.from_documents(splits, embeddings).as_retriever(search_kwargs={"k": 5})
+        # Directory mode - load all supported files, listing the directory once
+        with os.scandir(source_dir) as entries:
+            file_exts = sorted(
+                (entry.path, os.path.splitext(entry.name)[1].lower())
+                for entry in entries
+                if not entry.name.startswith('.') and entry.is_file()
+            )
+        file_paths = [path for path, ext in file_exts if ext in LOADERS]
+        image_paths = [path for path, ext in file_exts if ext in _IMG_EXTS]
+        parse_paths = [path for path, ext in file_exts if ext in LOADERS and ext not in _IMG_EXTS]
+
+        # Images wait on Gemini Vision, so they are gathered on an event loop in
+        # a helper thread (callers may already be inside one); parsing the other
+        # files is CPU-bound and runs in a process pool alongside them
+        loaded = {}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            image_results = executor.submit(asyncio.run, _load_images(image_paths))
+            if len(parse_paths) >= 2 and LOAD_PROCESSES > 1:
+                # Spawn, not fork: this process already runs gRPC/httpx clients,
+                # the log listener and threadpool threads, which fork can deadlock
+                spawn = multiprocessing.get_context("spawn")
+                with spawn.Pool(min(LOAD_PROCESSES, len(parse_paths))) as pool:
+                    loaded.update(zip(parse_paths, pool.imap(_load_single, parse_paths)))
+            else:
+                loaded.update((path, _load_single(path)) for path in parse_paths)
+            loaded.update(zip(image_paths, image_results.result()))
+
+        for file_path in file_paths:
+            documents.extend(loaded[file_path])
+
+    logger.debug("Loaded %d documents from %s", len(documents), source_dir)
+
+    if not documents:
+        raise ValueError("No documents found in the specified sources or failed to extract text")
+
+    return documents
+
+
+def _vector_store_cache_dir(
+    doc_hash: str, chunk_size: int = RAG_CHUNK_SIZE, chunk_overlap: int = RAG_CHUNK_OVERLAP
+) -> str:
+    # Vectors are only comparable within one embedding model and chunking setup
+    model = re.sub(r"[^A-Za-z0-9.-]+", "_", GEMINI_EMBED_MODEL)
+    return os.path.join(
+        FAISS_CACHE_DIR, f"{doc_hash}-{model}-{RAG_TOKEN_ENCODING}-tok{chunk_size}-{chunk_overlap}"
+    )
+
+
+def _fingerprint(path: str) -> str:
+    """
+    sha256 of a file's bytes, read in 1 MB chunks
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def is_vector_store_cached(doc_hash: str) -> bool:
+    return os.path.isfile(os.path.join(_vector_store_cache_dir(doc_hash), FAISS_CHUNKS_FILE))
+
+
+def load_cached_vector_store(doc_hash: str, embeddings: Embeddings) -> Optional[VectorStoreRetriever]:
+    """
+    Load the retriever cached for a document hash, or None if there is none
+    """
+    if not is_vector_store_cached(doc_hash):
+        return None
+
+    import faiss
+
+    cache_dir = _vector_store_cache_dir(doc_hash)
+    try:
+        index = faiss.read_index(os.path.join(cache_dir, FAISS_INDEX_FILE))
+        with open(os.path.join(cache_dir, FAISS_CHUNKS_FILE), encoding="utf-8") as f:
+            chunks = json.load(f)
+
+        vector_store = _wrap_index(index, [Document(**chunk) for chunk in chunks], embeddings)
+    except Exception as e:
+        logger.warning("Ignoring unreadable FAISS cache %s: %s", cache_dir, e)
+        return None
+
+    # The entry's mtime is its last use, for eviction
+    try:
+        os.utime(cache_dir)
+    except OSError:
+        pass
+    return vector_store.as_retriever(search_kwargs={"k": RAG_TOP_K})
+
+
+def create_vector_store(
+    docs: List[Document],
+    embeddings: Embeddings,
+    chunk_size: int = RAG_CHUNK_SIZE,
+    chunk_overlap: int = RAG_CHUNK_OVERLAP,
+    doc_hash: Optional[str] = None,
+) -> VectorStoreRetriever:
+    """
+    Create vector store from documents, caching the index when doc_hash is given
+    """
+    import tiktoken
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    encoding = tiktoken.get_encoding(RAG_TOKEN_ENCODING)
+    # Uploaded text may contain "<|endoftext|>" and the like; count it as plain text
+    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=RAG_TOKEN_ENCODING,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+        disallowed_special=(),
+    )
+
+    splits = []
+    for doc in docs:
+        if not doc.page_content.strip():
+            continue
+        # Pages that already fit in one chunk skip the splitter entirely
+        if len(encoding.encode(doc.page_content, disallowed_special=())) <= chunk_size:
+            splits.append(Document(page_content=doc.page_content, metadata={**doc.metadata, "start_index": 0}))
+        else:
+            splits.extend(text_splitter.split_documents([doc]))
+
+    if not splits:
+        raise ValueError("Documents did not contain any readable text chunks")
+
+    # Embed all chunks in batched requests rather than letting FAISS iterate.
+    # Repeated text (form headers, footers, disclaimers) is embedded once and
+    # its vector reused for every copy, which keeps its own metadata
+    texts = [split.page_content for split in splits]
+    metadatas = [split.metadata for split in splits]
+    unique_positions: Dict[str, int] = {}
+    positions = [unique_positions.setdefault(text, len(unique_positions)) for text in texts]
+    unique_vectors = _embed_texts(embeddings, list(unique_positions))
+    vectors = [unique_vectors[position] for position in positions]
+
+    # Use FAISS for retrieval
+    documents = [Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)]
+    vector_store = _wrap_index(_build_index(vectors), documents, embeddings)
+
+    if doc_hash:
+        _save_vector_store(vector_store, _vector_store_cache_dir(doc_hash, chunk_size, chunk_overlap))
+
+    return vector_store.as_retriever(search_kwargs={"k": RAG_TOP_K})
+
+
+def _unit_vectors(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    float32 matrix of the vectors scaled to unit length, so inner product is cosine similarity
+    """
+    import faiss
+    import numpy as np
+
+    matrix = np.asarray(vectors, dtype="float32")
+    faiss.normalize_L2(matrix)
+    return matrix
+
+
+def _build_index(vectors: List[List[float]]):
+    """
+    Build an approximate inner-product FAISS index over the normalized
+    vectors: IVF-PQ for large corpora (about sqrt(N) search cost and compact
+    codes), HNSW over 8-bit scalar-quantized vectors for smaller ones. Both
+    keep codes rather than float32 vectors, so the index is at least 4x smaller.
+    """
+    import faiss
+
+    matrix = _unit_vectors(vectors)
+    count, dimension = matrix.shape
+
+    if count > FAISS_IVFPQ_MIN_CHUNKS:
+        # PQ needs a sub-quantizer count that divides the dimension
+        m = next(m for m in (32, 16, 8, 4, 2, 1) if dimension % m == 0)
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, int(4 * math.sqrt(count)), m, 8, faiss.METRIC_INNER_PRODUCT)
+        index.train(matrix)
+        index.nprobe = FAISS_NPROBE
+    else:
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        # Learns each dimension's value range for the 8-bit codes
+        index.train(matrix)
+
+    index.add(matrix)
+    return index
+
+
+def _wrap_index(index, documents: List[Document], embeddings: Embeddings) -> FAISS:
+    """
+    Wrap a raw faiss index in LangChain's FAISS store; documents[i] is vector i
+    """
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
+
+    if hasattr(index, "nprobe"):
+        index.nprobe = FAISS_NPROBE
+    index = _index_to_gpu(index)
+
+    docstore_ids = [str(position) for position in range(len(documents))]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(docstore_ids, documents))),
+        index_to_docstore_id=dict(enumerate(docstore_ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
+
+
+def _index_to_gpu(index):
+    """
+    Copy the index to all GPUs when enabled; stays on CPU if faiss has no GPU
+    support or the index type (e.g. HNSW) cannot run there
+    """
+    if not USE_GPU_FAISS:
+        return index
+
+    import faiss
+
+    try:
+        return faiss.index_cpu_to_all_gpus(index)
+    except (AttributeError, RuntimeError) as e:
+        logger.warning("Keeping FAISS index on CPU: %s", e)
+        return index
+
+
+def _index_to_cpu(index):
+    """
+    CPU copy of an index for writing to disk (GPU indexes cannot be serialized)
+    """
+    if not USE_GPU_FAISS:
+        return index
+
+    import faiss
+
+    try:
+        return faiss.index_gpu_to_cpu(index)
+    except (AttributeError, RuntimeError):
+        return index
+
+
+def _embed_texts(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts in slices of EMBED_BATCH_SIZE, sending the slices concurrently
+    so indexing a large document is not bound by one round-trip at a time
+    """
+
+    def embed_batch(batch: List[str]) -> List[List[float]]:
+        return embeddings.embed_documents(batch, batch_size=EMBED_BATCH_SIZE, task_type="retrieval_document")
+
+    batches = [texts[start : start + EMBED_BATCH_SIZE] for start in range(0, len(texts), EMBED_BATCH_SIZE)]
+    if len(batches) == 1:
+        return embed_batch(batches[0])
+
+    with ThreadPoolExecutor(max_workers=min(EMBED_MAX_WORKERS, len(batches))) as executor:
+        return [vector for batch_vectors in executor.map(embed_batch, batches) for vector in batch_vectors]
+
+
+def _save_vector_store(vector_store: FAISS, cache_dir: str) -> None:
+    """
+    Save the index under a temporary name and move it into place, so other
+    workers never load a half-written cache entry
+    """
+    import faiss
+
+    tmp_dir = f"{cache_dir}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(tmp_dir)
+        faiss.write_index(_index_to_cpu(vector_store.index), os.path.join(tmp_dir, FAISS_INDEX_FILE))
+
+        # Chunks in index order, so position i in the index is chunks[i]
+        chunks = []
+        for position in range(vector_store.index.ntotal):
+            doc = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+            chunks.append({"page_content": doc.page_content, "metadata": doc.metadata})
+        with open(os.path.join(tmp_dir, FAISS_CHUNKS_FILE), "w", encoding="utf-8") as f:
+            json.dump(chunks, f, ensure_ascii=False, default=str)
+
+        os.replace(tmp_dir, cache_dir)
+    except (OSError, RuntimeError) as e:
+        # Another worker may have cached the same document first
+        logger.warning("Could not cache FAISS index %s: %s", cache_dir, e)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+
+    _evict_vector_store_cache()
+
+
+def _evict_vector_store_cache() -> None:
+    """
+    Remove cache entries unused for FAISS_CACHE_MAX_AGE, then the least
+    recently used ones until the cache fits in FAISS_CACHE_MAX_BYTES
+    """
+    entries = []
+    try:
+        with os.scandir(FAISS_CACHE_DIR) as cache_entries:
+            for entry in cache_entries:
+                # Skip entries another worker is still writing
+                if not entry.is_dir() or entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    with os.scandir(entry.path) as files:
+                        size = sum(f.stat().st_size for f in files if f.is_file())
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+                except OSError:
+                    # Evicted by another worker meanwhile
+                    continue
+    except OSError as e:
+        logger.warning("Could not scan FAISS cache %s: %s", FAISS_CACHE_DIR, e)
+        return
+
+    entries.sort()
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    for last_used, size, path in entries:
+        if now - last_used <= FAISS_CACHE_MAX_AGE and total <= FAISS_CACHE_MAX_BYTES:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+@functools.lru_cache(maxsize=1)
+def _get_reranker():
+    from flashrank import Ranker
+
+    return Ranker(model_name=RAG_RERANK_MODEL)
+
+
+def rerank_documents(query: str, documents: List[Document], top_n: int = RAG_RERANK_TOP_N) -> List[Document]:
+    """
+    Reorder retrieved documents with a cross-encoder and keep the best top_n
+    """
+    try:
+        from flashrank import RerankRequest
+
+        ranker = _get_reranker()
+    except ImportError:
+        logger.warning("flashrank is not installed; skipping rerank")
+        return documents
+
+    passages = [{"id": i, "text": doc.page_content} for i, doc in enumerate(documents)]
+    ranked = ranker.rerank(RerankRequest(query=query, passages=passages))
+    return [documents[passage["id"]] for passage in ranked[:top_n]]
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by query embedding, so near-duplicate questions
+    skip retrieval and the Gemini call entirely
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._index = None
+        self._results = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        return _unit_vectors([embedding])
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[dict]:
+        """Return the cached result for the most similar query above threshold"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(vector, 1)
+            if scores[0][0] >= self.threshold:
+                return self._results[ids[0][0]]
+        return None
+
+    def add(self, embedding: Sequence[float], result: dict) -> None:
+        import faiss
+        import numpy as np
+
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(vector.shape[1])
+            if self._index.ntotal >= self.max_entries:
+                # Drop the oldest entry; flat index ids shift down like the list
+                self._index.remove_ids(np.arange(1, dtype="int64"))
+                self._results.pop(0)
+            self._index.add(vector)
+            self._results.append(result)
+
+
+def build_context(source_documents: List[Document]) -> str:
+    """
+    Join retrieved chunks for the prompt, trimming each to RAG_MAX_CHUNK_CHARS
+    and stopping before the total passes RAG_MAX_CONTEXT_CHARS (the best-ranked
+    chunk is always kept)
+    """
+    parts = []
+    total = 0
+    for doc in source_documents:
+        text = doc.page_content[:RAG_MAX_CHUNK_CHARS]
+        # Identical chunks from different pages share a vector, so they come back together
+        if text in parts:
+            continue
+        if parts and total + len(text) > RAG_MAX_CONTEXT_CHARS:
+            break
+        parts.append(text)
+        total += len(text) + 2
+    return "\n\n".join(parts)
+
+
+class RetrievalCache:
+    """
+    LRU cache of retrieved chunk sets and their joined context, keyed by the
+    chunk ids, plus a query -> chunk set map so repeat queries skip the search
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._query_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chunk_key(source_documents: List[Document]) -> str:
+        chunk_ids = sorted(
+            f"{doc.metadata.get('source')}:{doc.metadata.get('page')}:{doc.metadata.get('start_index')}"
+            for doc in source_documents
+        )
+        return hashlib.blake2b("|".join(chunk_ids).encode(), digest_size=16).hexdigest()
+
+    def get(self, query: str) -> Optional[Tuple[str, List[Document]]]:
+        """Return (context, source_documents) previously retrieved for this exact query"""
+        with self._lock:
+            key = self._query_keys.get(query)
+            if key is None or key not in self._entries:
+                return None
+            self._query_keys.move_to_end(query)
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, query: str, source_documents: List[Document]) -> Tuple[str, List[Document]]:
+        """Store a retrieval result, reusing the joined context if the chunk set is known"""
+        key = self.chunk_key(source_documents)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = (build_context(source_documents), source_documents)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._query_keys[query] = key
+            self._query_keys.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            while len(self._query_keys) > self.max_entries * 4:
+                self._query_keys.popitem(last=False)
+        return entry
 
 
 PROMPT_TEMPLATE = """
@@ -272,62 +813,231 @@ Do not guess — only provide verifiable facts.
 Answer:
 """
 
+# Static part of the prompt (everything before {context}) and the per-query rest
+PROMPT_PREFIX, _, _prompt_rest = PROMPT_TEMPLATE.partition("{context}")
+_PROMPT_BEFORE_QUESTION, _, _PROMPT_AFTER_QUESTION = _prompt_rest.partition("{question}")
+# General Q&A has no context, so the blank line after {context} goes too
+_PROMPT_GENERAL_BEFORE_QUESTION = _PROMPT_BEFORE_QUESTION.removeprefix("\n\n")
 
-def get_qa_chain(source_dir):
-  """
-  Create QA chain with proper error handling
-  """
-  try:
-    docs = load_documents(source_dir)
-    llm, embeddings = load_model()
-    retriever = create_vector_store(docs, embeddings)
 
-    prompt = PromptTemplate(
-      template=PROMPT_TEMPLATE,
-      input_variables=["context", "question"]
+def format_prompt(context: str, question: str, include_prefix: bool = True) -> str:
+    """
+    Fill PROMPT_TEMPLATE with one concatenation instead of PromptTemplate.format;
+    the template only has these two placeholders. Pass an empty context for
+    general Q&A. Set include_prefix=False when the static prefix is served from
+    Gemini's context cache.
+    """
+    return "".join(
+        (
+            PROMPT_PREFIX if include_prefix else "",
+            context,
+            _PROMPT_BEFORE_QUESTION if context else _PROMPT_GENERAL_BEFORE_QUESTION,
+            question,
+            _PROMPT_AFTER_QUESTION,
+        )
     )
 
-    def run_chain(inputs):
-      query = inputs.get("query") or inputs.get("question")
-      if not query:
-        raise ValueError("A 'query' input is required")
 
-      source_documents = retriever.invoke(query)
-      context = "\n\n".join(doc.page_content for doc in source_documents)
-      prompt_text = prompt.format(context=context, question=query)
-      raw_response = llm.invoke(prompt_text)
+_prompt_cache = {"name": None, "expires_at": 0.0}
+_prompt_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _prompt_prefix_cacheable() -> bool:
+    import tiktoken
+
+    # The RAG tokenizer only approximates Gemini's, which is close enough here
+    tokens = len(tiktoken.get_encoding(RAG_TOKEN_ENCODING).encode(PROMPT_PREFIX, disallowed_special=()))
+    if tokens < GEMINI_PROMPT_CACHE_MIN_TOKENS:
+        logger.warning(
+            "Prompt prefix is ~%d tokens, below Gemini's %d-token caching minimum; sending prompt inline",
+            tokens,
+            GEMINI_PROMPT_CACHE_MIN_TOKENS,
+        )
+        return False
+    return True
+
+
+def get_prompt_cache_name() -> Optional[str]:
+    """
+    Return the Gemini cached-content name holding PROMPT_PREFIX, creating or
+    renewing it as needed. Returns None when caching is disabled, the prefix
+    is below the model's minimum cacheable size, or caching fails, in which
+    case callers send the full prompt inline.
+    """
+    if not GEMINI_PROMPT_CACHE or not GEMINI_API_KEY or not _prompt_prefix_cacheable():
+        return None
+
+    with _prompt_cache_lock:
+        # Renew a minute early so in-flight requests never reference an expired cache
+        if _prompt_cache["name"] and time.time() < _prompt_cache["expires_at"] - 60:
+            return _prompt_cache["name"]
+
+        try:
+            from google.ai import generativelanguage_v1beta as glm
+
+            client = glm.CacheServiceClient(client_options={"api_key": GEMINI_API_KEY})
+            cached_content = client.create_cached_content(
+                cached_content=glm.CachedContent(
+                    model=os.environ.get("GEMINI_CHAT_MODEL", "models/gemini-2.5-flash"),
+                    system_instruction=glm.Content(parts=[glm.Part(text=PROMPT_PREFIX)]),
+                    ttl=datetime.timedelta(seconds=GEMINI_PROMPT_CACHE_TTL),
+                )
+            )
+            _prompt_cache["name"] = cached_content.name
+            _prompt_cache["expires_at"] = time.time() + GEMINI_PROMPT_CACHE_TTL
+        except Exception as e:
+            logger.warning("Gemini prompt cache unavailable, sending prompt inline: %s", e)
+            _prompt_cache["name"] = None
+            # Don't retry on every request
+            _prompt_cache["expires_at"] = time.time() + GEMINI_PROMPT_CACHE_TTL
+
+        return _prompt_cache["name"]
+
+
+def get_qa_chain(source_dir: Optional[str], doc_hash: Optional[str] = None) -> Optional[QAChain]:
+    """
+    Create QA chain with proper error handling
+
+    source_dir is a file or directory path, or None when only the cached index
+    is expected to exist. doc_hash defaults to
+    the file's sha256; when an index is cached for it, neither parsing nor
+    embedding runs.
+    """
+    try:
+        if doc_hash is None and source_dir and os.path.isfile(source_dir):
+            doc_hash = _fingerprint(source_dir)
+
+        llm, embeddings = load_model()
+        retriever = load_cached_vector_store(doc_hash, embeddings) if doc_hash else None
+        if retriever is None:
+            docs = load_documents(source_dir)
+            retriever = create_vector_store(docs, embeddings, doc_hash=doc_hash)
+        semantic_cache = SemanticCache()
+        retrieval_cache = RetrievalCache()
+
+        def run_chain(inputs: dict) -> dict:
+            query = inputs.get("query") or inputs.get("question")
+            if not query:
+                raise ValueError("A 'query' input is required")
+
+            # Identical query strings reuse their retrieval without embedding or
+            # searching (exact repeat answers are already cached by query_system)
+            query_embedding = None
+            cached_retrieval = retrieval_cache.get(query)
+            if cached_retrieval is None:
+                # Embed once: used for the semantic cache and for the FAISS search
+                query_embedding = embeddings.embed_query(query)
+                cached = semantic_cache.lookup(query_embedding)
+                if cached is not None:
+                    return cached
+
+                # The inner-product index holds unit vectors, so the query must be one too
+                source_documents = retriever.vectorstore.similarity_search_by_vector(
+                    _unit_vectors([query_embedding])[0], **retriever.search_kwargs
+                )
+                if RAG_RERANK_TOP_N:
+                    source_documents = rerank_documents(query, source_documents)
+                cached_retrieval = retrieval_cache.put(query, source_documents)
+            context, source_documents = cached_retrieval
+            prompt_cache_name = get_prompt_cache_name()
+            if prompt_cache_name:
+                # Static prefix is already on Gemini's side; send only context + question
+                prompt_text = format_prompt(context, query, include_prefix=False)
+                raw_response = llm.invoke(prompt_text, cached_content=prompt_cache_name)
+            else:
+                raw_response = llm.invoke(format_prompt(context, query))
 
-      if hasattr(raw_response, "content"):
-        answer = raw_response.content
-      else:
-        answer = raw_response
+            if hasattr(raw_response, "content"):
+                answer = raw_response.content
+            else:
+                answer = raw_response
 
-      if isinstance(answer, list):
-        answer = " ".join(str(chunk) for chunk in answer)
+            if isinstance(answer, list):
+                answer = " ".join(str(chunk) for chunk in answer)
 
-      return {"result": answer, "source_documents": source_documents}
+            result = {"result": answer, "source_documents": source_documents}
+            if query_embedding is not None:
+                semantic_cache.add(query_embedding, result)
+            return result
 
-    return run_chain
+        # Chains over the same document share query cache entries
+        run_chain.cache_key = doc_hash or uuid.uuid4().hex
+        return run_chain
 
-  except Exception as e:
-    print(f"[ERROR] Initializing QA system: {e}")
-    return None
+    except Exception:
+        logger.exception("Initializing QA system failed")
+        return None
 
 
-def query_system(query: str, qa_chain):
-  """
-  Query the QA system
-  """
-  if not qa_chain:
-    return "System not initialized properly"
+_query_cache: TTLCache = TTLCache(maxsize=QUERY_CACHE_MAX_ENTRIES, ttl=QUERY_CACHE_TTL)
+_query_in_flight: Dict[tuple, Future] = {}
+_query_lock = threading.Lock()
+
+
+def query_system(query: str, qa_chain: Optional[QAChain]) -> str:
+    """
+    Query the QA system
+
+    Answers are cached by (chain, normalized query), and identical queries
+    arriving while one is running wait for its answer instead of calling Gemini again.
+    """
+    if not qa_chain:
+        return "System not initialized properly"
+
+    key = (getattr(qa_chain, "cache_key", id(qa_chain)), " ".join(query.lower().split()))
+    with _query_lock:
+        answer = _query_cache.get(key)
+        if answer is not None:
+            return answer
+        future = _query_in_flight.get(key)
+        if future is None:
+            future = _query_in_flight[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return future.result()
+
+    answer, cacheable = None, False
+    try:
+        answer, cacheable = _run_query(query, qa_chain)
+        return answer
+    finally:
+        with _query_lock:
+            if cacheable:
+                _query_cache[key] = answer
+            _query_in_flight.pop(key, None)
+        future.set_result(answer if answer is not None else "Error processing query")
+
+
+def _run_query(query: str, qa_chain: QAChain) -> Tuple[str, bool]:
+    """
+    Run the chain once; returns the answer and whether it may be cached
+    """
+    try:
+        result = qa_chain({"query": query})
+        if not result["result"] or "don't know" in result["result"].lower():
+            return "The answer could not be found in the provided documents", True
+        return f"{BRAND}: {result['result']}", True
+    except Exception as e:
+        return f"Error processing query: {e}", False
+
 
-  try:
-    result = qa_chain({"query": query})
-    if not result["result"] or "don't know" in result["result"].lower():
-      return "The answer could not be found in the provided documents"
-    return f"HuduAssist 🇰🇪: {result['result']}"  
-  except Exception as e:
-    return f"Error processing query: {e}"
+def preload_dependencies() -> None:
+    """
+    Import the heavy dependencies up front. Called in the Gunicorn master so
+    forked workers share them instead of each importing them on first use,
+    and by the API's health probe so a missing one is reported up front.
+    """
+    import faiss  # noqa: F401
+    import tiktoken  # noqa: F401
+    from langchain_community.document_loaders.csv_loader import CSVLoader  # noqa: F401
+    from langchain_community.document_loaders.pdf import PyPDFLoader  # noqa: F401
+    from langchain_community.vectorstores import FAISS  # noqa: F401
+    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings  # noqa: F401
+    from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: F401
 
 
 # Example usage:
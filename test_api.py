@@ -4,12 +4,20 @@ Run this after starting the API server to test endpoints
 """
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_URL = "http://localhost:8000"
 
+# One pooled keep-alive session for every call, retrying dropped connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def test_health():
     """Test health endpoint"""
-    response = requests.get(f"{API_URL}/health")
+    response = SESSION.get(f"{API_URL}/health")
     print("Health Check:", response.json())
     return response.status_code == 200
 
@@ -17,7 +25,7 @@ def test_upload(file_path: str):
     """Test document upload"""
     with open(file_path, 'rb') as f:
         files = {'file': (file_path.split('/')[-1], f, 'application/pdf')}
-        response = requests.post(f"{API_URL}/upload", files=files)
+        response = SESSION.post(f"{API_URL}/upload", files=files)
     
     if response.status_code == 200:
         data = response.json()
@@ -33,7 +41,7 @@ def test_query(session_id: str, query: str):
         "query": query,
         "session_id": session_id
     }
-    response = requests.post(
+    response = SESSION.post(
         f"{API_URL}/query",
         json=payload,
         headers={"Content-Type": "application/json"}
@@ -72,7 +80,7 @@ if __name__ == "__main__":
             
             # Clean up
             print("\nCleaning up session...")
-            requests.delete(f"{API_URL}/session/{session_id}")
+            SESSION.delete(f"{API_URL}/session/{session_id}")
             print("Session deleted")
     else:
         print("Skipping upload test")
@@ -1,25 +1,38 @@
 """Test script to upload PDF to the API"""
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
 
 API_URL = "https://hudumabackend.onrender.com"
 PDF_PATH = r"C:\Users\SEPIA\Downloads\Kenya_Birth_ApplicationBirthCertificate_Form-B4.pdf"
 
+# One pooled keep-alive session for every call, retrying dropped connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+# A streamed MultipartEncoder body can't be rewound, so a retry after a partial
+# send would post a truncated file; the upload endpoint gets no retries
+SESSION.mount(f"{API_URL}/upload", HTTPAdapter(max_retries=0))
+
 print("Testing API upload...")
 print(f"API URL: {API_URL}")
 print(f"PDF Path: {PDF_PATH}")
 
 # Test health first
 print("\n1. Testing health endpoint...")
-response = requests.get(f"{API_URL}/health")
+response = SESSION.get(f"{API_URL}/health")
 print(f"Health Status: {response.status_code}")
 print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 # Upload PDF
 print("\n2. Uploading PDF...")
+# MultipartEncoder streams the file from disk instead of building the whole body in memory
 with open(PDF_PATH, 'rb') as f:
-    files = {'file': (PDF_PATH.split('\\')[-1], f, 'application/pdf')}
-    response = requests.post(f"{API_URL}/upload", files=files)
+    upload = MultipartEncoder(fields={'file': (PDF_PATH.split('\\')[-1], f, 'application/pdf')})
+    response = SESSION.post(f"{API_URL}/upload", data=upload, headers={'Content-Type': upload.content_type})
 
 print(f"Upload Status: {response.status_code}")
 if response.status_code == 200:
@@ -29,7 +42,7 @@ if response.status_code == 200:
     
     # Test query
     print("\n3. Testing query...")
-    query_response = requests.post(
+    query_response = SESSION.post(
         f"{API_URL}/query",
         json={
             "query": "What information is needed to fill this form?",